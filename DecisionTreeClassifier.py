@@ -4,6 +4,7 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 import re
+from text_budget import bounded_text, DEFAULT_MAX_CHARS, DEFAULT_MAX_TOKENS
 
 class SpamDetector:
     df_train = None
@@ -13,24 +14,26 @@ class SpamDetector:
     y_test = None
     y_pred = None
 
-    def __init__(self):
+    def __init__(self, max_chars=None, max_tokens=None):
         self.df_train = pd.read_csv('emails.csv')
         self.df_test = pd.read_csv('spam_ham_dataset.csv')
         self.punctuations = "\'\"\,<>./?@#$%^&*_~/!()-[]{};:"
         self.stop_words = stopwords.words('english')
+        self.max_chars = max_chars
+        self.max_tokens = max_tokens
 
-    def createClassifier(self):
-        self.classifier = DecisionTreeClassifier()
+    def createClassifier(self, max_depth=None, min_samples_leaf=1):
+        self.classifier = DecisionTreeClassifier(max_depth=max_depth, min_samples_leaf=min_samples_leaf)
         self.vectorizer = TfidfVectorizer(stop_words='english', max_features=5000)
 
     def train(self):
-        x_train = self.df_train['text']
+        x_train = self.bound_texts(self.df_train['text'])
         y_train = self.df_train['spam']
         x_train_transformed = self.vectorizer.fit_transform(x_train)
         self.classifier.fit(x_train_transformed, y_train)
 
     def predict(self):
-        x_test = self.df_test['text']
+        x_test = self.bound_texts(self.df_test['text'])
         y_test = self.df_test['label_num']
         x_test_transformed = self.vectorizer.transform(x_test)
         y_pred = self.classifier.predict(x_test_transformed)
@@ -45,13 +48,24 @@ class SpamDetector:
         print('Confusion Matrix:')
         print(confusion_matrix(self.y_test, self.y_pred))
 
-    def predict_spam_probability(self, email_text):
+    def predict_spam_probability(self, email_text, reputation=None):
+        if reputation is not None:
+            verdict = reputation.verdict(email_text)
+            if verdict is not None:
+                return 1.0 if verdict == 'spam' else 0.0
         email_text = self.read_and_preprocess_email_text(email_text)
         email_transformed = self.vectorizer.transform([email_text])
         spam_probability = self.classifier.predict_proba(email_transformed)[0][1]
         return spam_probability
 
+    def bound_texts(self, texts):
+        if self.max_chars is None and self.max_tokens is None:
+            return texts
+        return texts.apply(bounded_text, args=(self.max_chars, self.max_tokens))
+
     def read_and_preprocess_email_text(self, email_text):
+        if self.max_chars is not None or self.max_tokens is not None:
+            email_text = bounded_text(email_text, self.max_chars, self.max_tokens)
         punctuations = self.punctuations
         stop_words = self.stop_words
         numbers = "1234567890"
@@ -80,7 +94,7 @@ class SpamDetector:
 
 if __name__ == '__main__':
     print('This is the Decision Tree Classifier')
-    decisionTreeClassifier = SpamDetector()
+    decisionTreeClassifier = SpamDetector(DEFAULT_MAX_CHARS, DEFAULT_MAX_TOKENS)
     decisionTreeClassifier.createClassifier()
     decisionTreeClassifier.train()
     decisionTreeClassifier.predict()
@@ -3,45 +3,142 @@ import re
 from nltk.corpus import stopwords
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble._forest import _generate_unsampled_indices, _get_n_samples_bootstrap
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 import nltk
+import numpy as np
+import pickle
+import time
+from text_budget import bounded_text, DEFAULT_MAX_CHARS, DEFAULT_MAX_TOKENS
 
 # Download stopwords if not already downloaded
 nltk.download('stopwords')
 stop_words = set(stopwords.words('english'))
 
 # Function to preprocess the email text
-def preprocess_text(text):
+def preprocess_text(text, max_chars=None, max_tokens=None):
+    if max_chars is not None or max_tokens is not None:
+        text = bounded_text(text, max_chars, max_tokens)  # Cap long emails to the size budget
     text = text.lower()                       # Convert to lowercase
     text = re.sub(r'[^a-z\s]', '', text)      # Remove punctuation and numbers
     text = ' '.join(word for word in text.split() if word not in stop_words)  # Remove stopwords
     return text
 
-# Step 1: Load and preprocess the training dataset
-train_df = pd.read_csv('emails.csv')  # Replace with the actual path to the training CSV
-train_df['text'] = train_df['text'].apply(preprocess_text)
+# Function to grow a forest in increments until the out-of-bag error stops improving
+def grow_forest(X, y, clf=None, step=10, max_estimators=300, tol=1e-3, patience=2,
+                max_depth=None, min_samples_leaf=1, random_state=42, n_jobs=-1):
+    """
+    Adds `step` trees at a time and stops once the out-of-bag error has
+    improved by less than `tol` for `patience` increments in a row. Each new
+    tree is scored once on its own out-of-bag rows of (X, y), so the stopping
+    rule costs one prediction per tree instead of sklearn's full OOB pass on
+    every refit, and trees kept from earlier data are never scored on rows
+    they were not bootstrapped from.
 
-# Step 2: Vectorize the training data using TF-IDF
-vectorizer = TfidfVectorizer(max_features=1000)  # Limit to top 1000 features for simplicity
-X_train = vectorizer.fit_transform(train_df['text']).toarray()
-y_train = train_df['spam']
+    Passing a previously grown `clf` keeps its trees and grows new ones on
+    (X, y), so X must come from the same fitted vectorizer and y must hold
+    the same classes. Its own max_depth, min_samples_leaf, random_state and
+    n_jobs are used; the arguments of the same name only apply to a new
+    forest. Trees are never evicted, so every call adds at least
+    `patience * step` trees and repeated retrains eventually hit
+    `max_estimators`; start a fresh forest (clf=None) at that point.
+    """
+    if step < 1:
+        raise ValueError("step must be at least 1")
+    if clf is None:
+        clf = RandomForestClassifier(n_estimators=0, max_depth=max_depth,
+                                     min_samples_leaf=min_samples_leaf,
+                                     random_state=random_state, n_jobs=n_jobs)
+    if not clf.bootstrap:
+        raise ValueError("grow_forest needs bootstrap=True to compute out-of-bag error")
+    trees_before = len(getattr(clf, 'estimators_', []))
+    if trees_before + step > max_estimators:
+        raise ValueError(f"max_estimators={max_estimators} leaves no room for {step} more trees "
+                         f"on top of the existing {trees_before}")
+    y = np.asarray(y)
+    if trees_before and not np.array_equal(np.unique(y), clf.classes_):
+        raise ValueError(f"new labels {np.unique(y)} do not match the forest's classes {clf.classes_}")
+    # Keep the existing trees on refit and skip the OOB pass over the whole forest
+    clf.set_params(warm_start=True, oob_score=False, n_estimators=trees_before)
 
-# Step 3: Train the Random Forest Classifier
-clf = RandomForestClassifier(n_estimators=100, random_state=42)
-clf.fit(X_train, y_train)
+    start = time.perf_counter()
+    n_samples = X.shape[0]
+    n_samples_bootstrap = _get_n_samples_bootstrap(n_samples, clf.max_samples)
+    # Running sum of the new trees' class probabilities on their out-of-bag rows
+    oob_proba = np.zeros((n_samples, len(np.unique(y))))
+    best_error = float('inf')
+    stale = 0
+    history = []
+    while clf.n_estimators + step <= max_estimators:
+        clf.n_estimators += step
+        clf.fit(X, y)
+        for tree in clf.estimators_[-step:]:
+            oob = _generate_unsampled_indices(tree.random_state, n_samples, n_samples_bootstrap)
+            oob_proba[oob] += tree.predict_proba(X[oob])
+        scored = oob_proba.sum(axis=1) > 0
+        oob_error = np.mean(clf.classes_[np.argmax(oob_proba[scored], axis=1)] != y[scored])
+        history.append((clf.n_estimators, oob_error))
+        if best_error - oob_error < tol:
+            stale += 1
+            if stale >= patience:
+                break
+        else:
+            stale = 0
+        best_error = min(best_error, oob_error)
+    report = {
+        'trees_built': len(clf.estimators_) - trees_before,
+        'total_trees': len(clf.estimators_),
+        'wall_time': time.perf_counter() - start,
+        'model_size': model_size(clf),
+        'oob_history': history,
+    }
+    return clf, report
 
-# Step 4: Load and preprocess the evaluation dataset
-eval_df = pd.read_csv('spam_ham_dataset.csv')  # Replace with the actual path to the evaluation CSV
-eval_df['text'] = eval_df['text'].apply(preprocess_text)
+# Function to measure the pickled size of a model in bytes
+def model_size(clf):
+    return len(pickle.dumps(clf))
 
-# Vectorize the evaluation data using the same TF-IDF vectorizer
-X_eval = vectorizer.transform(eval_df['text']).toarray()
-y_eval = eval_df['label_num']
+if __name__ == "__main__":
+    # Step 1: Load and preprocess the training dataset
+    train_df = pd.read_csv('emails.csv')  # Replace with the actual path to the training CSV
+    train_df['text'] = train_df['text'].apply(preprocess_text, max_chars=DEFAULT_MAX_CHARS, max_tokens=DEFAULT_MAX_TOKENS)
 
-# Step 5: Evaluate the model on the evaluation dataset
-y_pred_eval = clf.predict(X_eval)
+    # Step 2: Vectorize the training data using TF-IDF
+    vectorizer = TfidfVectorizer(max_features=1000)  # Limit to top 1000 features for simplicity
+    X_train = vectorizer.fit_transform(train_df['text']).toarray()
+    y_train = train_df['spam']
 
-# Display the results
-print("Evaluation Accuracy:", accuracy_score(y_eval, y_pred_eval))
-print("Evaluation Classification Report:\n", classification_report(y_eval, y_pred_eval))
-print("Evaluation Confusion Matrix:\n", confusion_matrix(y_eval, y_pred_eval))
\ No newline at end of file
+    # Step 3: Train the fixed Random Forest Classifier as a baseline
+    n_jobs = -1  # Same parallelism for both forests so the wall times are comparable
+    start = time.perf_counter()
+    fixed_clf = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=n_jobs)
+    fixed_clf.fit(X_train, y_train)
+    fixed_time = time.perf_counter() - start
+
+    # Grow the forest incrementally with OOB early stopping and bounded tree size
+    max_depth, min_samples_leaf = 50, 2
+    clf, report = grow_forest(X_train, y_train, max_depth=max_depth,
+                              min_samples_leaf=min_samples_leaf, n_jobs=n_jobs)
+    print(f"Fixed forest (unbounded trees): {len(fixed_clf.estimators_)} trees, "
+          f"{fixed_time:.2f}s, {model_size(fixed_clf)} bytes")
+    print(f"Incremental forest (max_depth={max_depth}, min_samples_leaf={min_samples_leaf}): "
+          f"{report['trees_built']} trees, {report['wall_time']:.2f}s, {report['model_size']} bytes")
+    print("Note: the difference combines early stopping and the tree size limits")
+    print("OOB error per increment:", report['oob_history'])
+
+    # Step 4: Load and preprocess the evaluation dataset
+    eval_df = pd.read_csv('spam_ham_dataset.csv')  # Replace with the actual path to the evaluation CSV
+    eval_df['text'] = eval_df['text'].apply(preprocess_text, max_chars=DEFAULT_MAX_CHARS, max_tokens=DEFAULT_MAX_TOKENS)
+
+    # Vectorize the evaluation data using the same TF-IDF vectorizer
+    X_eval = vectorizer.transform(eval_df['text']).toarray()
+    y_eval = eval_df['label_num']
+
+    # Step 5: Evaluate the model on the evaluation dataset
+    y_pred_eval = clf.predict(X_eval)
+
+    # Display the results
+    print("Fixed Forest Evaluation Accuracy:", accuracy_score(y_eval, fixed_clf.predict(X_eval)))
+    print("Evaluation Accuracy:", accuracy_score(y_eval, y_pred_eval))
+    print("Evaluation Classification Report:\n", classification_report(y_eval, y_pred_eval))
+    print("Evaluation Confusion Matrix:\n", confusion_matrix(y_eval, y_pred_eval))
\ No newline at end of file
@@ -6,6 +6,7 @@ from sklearn.metrics import accuracy_score, confusion_matrix, classification_rep
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import FunctionTransformer
 import re
+from text_budget import bounded_text, DEFAULT_MAX_CHARS, DEFAULT_MAX_TOKENS
 
 def preprocess_text(text):
     """
@@ -38,12 +39,25 @@ def preprocess_text(text):
     
     return text
 
-def create_spam_detector(training_data):
+def preprocess_texts(texts, max_chars=None, max_tokens=None):
+    """
+    Preprocesses a batch of emails, first capping each one to the size
+    budget if max_chars or max_tokens is set.
+    """
+    if max_chars is None and max_tokens is None:
+        return [preprocess_text(text) for text in texts]
+    return [preprocess_text(bounded_text(text, max_chars, max_tokens)) for text in texts]
+
+def create_spam_detector(training_data, max_chars=None, max_tokens=None):
     """
     Creates and trains the spam detector using the training dataset.
+    Setting max_chars or max_tokens enables the size-aware mode.
     """
     # Create preprocessing pipeline
-    preprocessor = FunctionTransformer(lambda x: [preprocess_text(text) for text in x])
+    preprocessor = FunctionTransformer(
+        preprocess_texts,
+        kw_args={'max_chars': max_chars, 'max_tokens': max_tokens}
+    )
     
     # Create TF-IDF vectorizer with improved parameters
     vectorizer = TfidfVectorizer(
@@ -68,9 +82,11 @@ def create_spam_detector(training_data):
     
     return pipeline
 
-def evaluate_model(pipeline, eval_data):
+def evaluate_model(pipeline, eval_data, uncapped_pipeline=None):
     """
     Evaluates the model performance using the evaluation dataset.
+    If uncapped_pipeline (trained without the size cap) is given, also
+    reports how much the cap changes accuracy end to end.
     """
     X_eval = eval_data['text']
     y_eval = eval_data['label_num']  # Using label_num column which has 0/1 values
@@ -92,16 +108,38 @@ def evaluate_model(pipeline, eval_data):
     print("\nDetailed Metrics:")
     print(f"Accuracy: {accuracy_score(y_eval, y_pred):.4f}")
     
-    return {
+    results = {
         'accuracy': accuracy_score(y_eval, y_pred),
         'predictions': y_pred,
         'probabilities': y_pred_proba
     }
+    
+    # Compare against a model trained and evaluated without the size cap
+    if uncapped_pipeline is not None:
+        y_pred_uncapped = uncapped_pipeline.predict(X_eval)
+        results['uncapped_accuracy'] = accuracy_score(y_eval, y_pred_uncapped)
+        print(f"Accuracy without size cap: {results['uncapped_accuracy']:.4f}")
+        print(f"Accuracy change from size cap: {results['accuracy'] - results['uncapped_accuracy']:+.4f}")
+    
+    return results
 
-def predict_email(pipeline, email_text):
+def predict_email(pipeline, email_text, reputation=None):
     """
     Predicts whether a new email is spam or not.
+    If a reputation index is given, messages it can decide skip the model.
     """
+    if reputation is not None:
+        verdict = reputation.verdict(email_text)
+        if verdict is not None:
+            is_spam = verdict == 'spam'
+            return {
+                'is_spam': is_spam,
+                'confidence': 1.0,
+                'probability_spam': float(is_spam),
+                'probability_ham': float(not is_spam),
+                'source': 'reputation'
+            }
+
     prediction = pipeline.predict([email_text])[0]
     probability = pipeline.predict_proba([email_text])[0]
     
@@ -111,7 +149,8 @@ def predict_email(pipeline, email_text):
         'is_spam': bool(prediction),
         'confidence': confidence,
         'probability_spam': probability[1],
-        'probability_ham': probability[0]
+        'probability_ham': probability[0],
+        'source': 'model'
     }
     
     return result
@@ -128,11 +167,12 @@ if __name__ == "__main__":
     
     # Create and train the model using the training dataset
     print("\nTraining model on emails.csv...")
-    spam_detector = create_spam_detector(training_data)
+    spam_detector = create_spam_detector(training_data, DEFAULT_MAX_CHARS, DEFAULT_MAX_TOKENS)
+    uncapped_detector = create_spam_detector(training_data)
     
     # Evaluate the model using the evaluation dataset
     print("\nEvaluating model on spam_ham_dataset.csv...")
-    evaluation_results = evaluate_model(spam_detector, evaluation_data)
+    evaluation_results = evaluate_model(spam_detector, evaluation_data, uncapped_detector)
     
     # Example of predicting a new email
     new_email = """Subject: Docker's Impact on Development From day one, Docker revolutionized software development — transforming the landscape with containers and simplified, cross-platform workflows. Since then, we've become the #1 platform for software developers worldwide.
@@ -0,0 +1,79 @@
+import time
+import pandas as pd
+from reputation_index import (ReputationIndex, extract_indicators, hash_indicator,
+                              PATHOLOGICAL_TEXTS)
+
+
+def test_extracts_tokenized_dataset_format():
+    indicators = extract_indicators(
+        "subject : re : meeting please reply to dfarmer @ enron . com . thanks for calling , "
+        "see www . epis . com and http : / / findgoodstuffhere . com / rm . php"
+    )
+    assert indicators == {
+        'addr:dfarmer@enron.com',
+        'domain:enron.com',
+        'domain:epis.com',
+        'domain:findgoodstuffhere.com',
+    }
+
+
+def test_accepts_uncommon_tlds():
+    assert extract_indicators("see www.spam-deals.hk/x now") == {'domain:spam-deals.hk'}
+    assert 'domain:mail.example.xyz' in extract_indicators("x@mail.example.xyz")
+
+
+def test_drops_matches_cut_by_window_edge():
+    # The tail window of 14 chars starts inside "dfarmer"
+    text = 'word ' * 100 + 'dfarmer@enron.com'
+    assert extract_indicators(text, max_chars=56) == set()
+    assert 'addr:dfarmer@enron.com' in extract_indicators(text, max_chars=None)
+
+    # The head window of 16 chars ends inside "enron.com", leaving "enron.co"
+    text = 'dfarmer@enron.com' + ' word' * 100
+    assert extract_indicators(text, max_chars=21) == set()
+
+
+def test_long_tokens_are_linear():
+    for text in PATHOLOGICAL_TEXTS:
+        start = time.perf_counter()
+        extract_indicators(text)
+        assert time.perf_counter() - start < 0.1
+
+
+def test_update_merges_counts():
+    index = ReputationIndex.build(pd.DataFrame({
+        'text': ['buy now www . bad . com', 'lunch ? bob @ good . org'],
+        'spam': [1, 0],
+    }))
+    index.update(pd.DataFrame({
+        'text': ['cheap www . bad . com', 'www . bad . com'],
+        'spam': [1, 0],
+    }))
+    assert index.lookup(['domain:bad.com', 'domain:good.org', 'domain:unseen.com']) == [
+        (2, 1), (0, 1), (0, 0)
+    ]
+    keys = index.entries['key']
+    assert list(keys) == sorted(keys)
+    assert len(set(keys)) == len(keys)
+
+
+def test_verdicts_and_mmap_load(tmp_path):
+    index = ReputationIndex.build(pd.DataFrame({
+        'text': ['buy www . bad . com'] * 3 + ['hi bob @ good . org'] * 3,
+        'spam': [1] * 3 + [0] * 3,
+    }))
+    path = tmp_path / 'reputation_index.npy'
+    index.save(path)
+
+    loaded = ReputationIndex.load(path)
+    assert loaded.entries.dtype == index.entries.dtype
+    assert hasattr(loaded.entries, 'filename')
+    assert loaded.verdict('click www . bad . com now') == 'spam'
+    assert loaded.verdict('from bob @ good . org') == 'ham'
+    assert loaded.verdict('no links here') is None
+    assert loaded.verdict('see www . unseen . com') is None
+
+
+def test_hash_indicator_is_stable():
+    assert hash_indicator('domain:enron.com') == hash_indicator('domain:enron.com')
+    assert hash_indicator('domain:enron.com') != hash_indicator('domain:enron.org')
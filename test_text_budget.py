@@ -0,0 +1,39 @@
+from text_budget import MAX_TOKEN_CHARS, budget_windows, bounded_text, bounded_tokens
+
+
+def test_short_text_is_unchanged():
+    assert bounded_text('subject : hello   world') == 'subject : hello world'
+    assert budget_windows(10, max_chars=20) == (10, 10)
+    assert budget_windows(10, max_chars=None) == (10, 10)
+
+
+def test_head_and_tail_windows():
+    assert budget_windows(100, max_chars=20) == (15, 95)
+    text = 'subject : hi ' + 'body ' * 1000 + 'the end'
+    tokens = list(bounded_tokens(text, max_chars=40, max_tokens=None))
+    assert tokens[:3] == ['subject', ':', 'hi']
+    assert tokens[-2:] == ['the', 'end']
+    assert len(' '.join(tokens)) <= 40
+
+
+def test_words_cut_by_window_edge_are_dropped():
+    # Head window is "aaaa bbbb" (9 chars), tail window is "ddd"
+    assert bounded_text('aaaa bbbb cccc dddd', max_chars=12, max_tokens=None) == 'aaaa bbbb'
+    # Head window ends inside "cccc"
+    assert bounded_text('aaaa bbbb cccc dddd', max_chars=14, max_tokens=None) == 'aaaa bbbb'
+
+
+def test_token_budget_splits_between_head_and_tail():
+    text = ' '.join(f'w{i}' for i in range(10000))
+    tokens = list(bounded_tokens(text, max_chars=2000, max_tokens=8))
+    assert tokens == ['w0', 'w1', 'w2', 'w3', 'w4', 'w5', 'w9998', 'w9999']
+    assert list(bounded_tokens('a b c d e', max_chars=None, max_tokens=2)) == ['a', 'b']
+
+
+def test_long_tokens_are_truncated_not_dropped():
+    tokens = list(bounded_tokens('subject : hi ' + 'a' * 14000 + ' bye'))
+    assert tokens == ['subject', ':', 'hi', 'a' * MAX_TOKEN_CHARS, 'bye']
+
+    # A message with no whitespace keeps the start of its head and tail windows
+    tokens = list(bounded_tokens('a' * 10_000_000))
+    assert tokens == ['a' * MAX_TOKEN_CHARS, 'a' * MAX_TOKEN_CHARS]
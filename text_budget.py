@@ -0,0 +1,72 @@
+import re
+from collections import deque
+
+TOKEN_PATTERN = re.compile(r'\S+')
+
+# Default per-message budget for the size-aware mode
+DEFAULT_MAX_CHARS = 20000
+DEFAULT_MAX_TOKENS = 2000
+
+# Longer tokens (base64, minified HTML) are truncated to this many characters
+MAX_TOKEN_CHARS = 100
+
+def budget_windows(length, max_chars=DEFAULT_MAX_CHARS, tail_fraction=0.25):
+    """
+    Returns (head_end, tail_start): the head window is text[:head_end] and
+    the tail window is text[tail_start:]. Both equal the length when the
+    text fits the budget.
+    """
+    if max_chars is None or length <= max_chars:
+        return length, length
+    tail_chars = int(max_chars * tail_fraction)
+    return max_chars - tail_chars, length - tail_chars
+
+def bounded_tokens(text, max_chars=DEFAULT_MAX_CHARS, max_tokens=DEFAULT_MAX_TOKENS, tail_fraction=0.25):
+    """
+    Lazily yields the whitespace tokens of a head window and a tail window
+    of the text, so the work done per message is bounded by the budget
+    rather than by the message size. The subject line is at the start of
+    the message and so always falls in the head window. Every token is
+    truncated to MAX_TOKEN_CHARS. A word cut by a window edge is dropped,
+    unless it already fills MAX_TOKEN_CHARS, so a message without whitespace
+    still yields its first and last characters. Passing None disables that
+    part of the cap.
+    """
+    text = str(text)
+    head_end, tail_start = budget_windows(len(text), max_chars, tail_fraction)
+    has_tail = tail_start < len(text)
+
+    if max_tokens is None:
+        head_limit = tail_limit = None
+    else:
+        tail_limit = int(max_tokens * tail_fraction) if has_tail else 0
+        head_limit = max_tokens - tail_limit
+
+    emitted = 0
+    for match in TOKEN_PATTERN.finditer(text, 0, head_end):
+        if head_limit is not None and emitted >= head_limit:
+            break
+        cut = match.end() == head_end and head_end < len(text) and not text[head_end].isspace()
+        if cut and match.end() - match.start() < MAX_TOKEN_CHARS:
+            break
+        emitted += 1
+        yield _capped_token(text, match)
+
+    if has_tail:
+        tail = deque(maxlen=tail_limit)
+        for match in TOKEN_PATTERN.finditer(text, tail_start):
+            cut = match.start() == tail_start and not text[tail_start - 1].isspace()
+            if cut and match.end() - match.start() < MAX_TOKEN_CHARS:
+                continue
+            tail.append(_capped_token(text, match))
+        yield from tail
+
+def _capped_token(text, match):
+    return text[match.start():min(match.end(), match.start() + MAX_TOKEN_CHARS)]
+
+def bounded_text(text, max_chars=DEFAULT_MAX_CHARS, max_tokens=DEFAULT_MAX_TOKENS):
+    """
+    Joins the bounded token stream back into a single string for the
+    existing preprocessing and vectorizing steps.
+    """
+    return ' '.join(bounded_tokens(text, max_chars, max_tokens))